@@ -6,7 +6,11 @@ Run pipelines, triage dead-letter files, and inspect structural diffs.
 
 import argparse
 import asyncio
+import sys
+from collections import Counter
 from pathlib import Path
+
+from guardrails.jsonio import loads as json_loads
 from guardrails.logs import setup as setup_logs
 from pipelines.nba_boxscores import run as run_nba
 
@@ -22,6 +26,21 @@ def read_urls(path: Path):
     ]
 
 
+def run_async(coro):
+    """Run a coroutine on uvloop when it's installed, else stdlib asyncio."""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+
+    uvloop.install()
+    return asyncio.run(coro)
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="scraper-guardrails",
@@ -53,7 +72,7 @@ def main():
         urls = read_urls(args.urls_file)
 
         if args.pipeline == "nba":
-            asyncio.run(
+            run_async(
                 run_nba(
                     urls,
                     args.out,
@@ -69,14 +88,15 @@ def main():
             print(f"No dead-letter file found at {dlq}")
             return 2
 
-        import json
-        counts = {}
-        for line in dlq.read_text(encoding="utf-8").splitlines():
-            try:
-                err = json.loads(line).get("error", "UNKNOWN")
-            except Exception:
-                err = "PARSE_ERROR"
-            counts[err] = counts.get(err, 0) + 1
+        # Stream the file line by line so memory stays flat for large DLQs
+        counts = Counter()
+        with dlq.open("rb") as f:
+            for line in f:
+                try:
+                    err = json_loads(line).get("error", "UNKNOWN")
+                except Exception:
+                    err = "PARSE_ERROR"
+                counts[err] += 1
 
         print("Dead-letter summary:")
         for k, v in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])):
@@ -5,5 +5,6 @@ __all__ = [
     "selectors",
     "diffwatch",
     "health",
+    "jsonio",
     "logs",
 ]
@@ -8,7 +8,11 @@ This allows the scraper to detect upstream changes BEFORE failures cascade.
 """
 
 import hashlib
-from bs4 import BeautifulSoup
+import os
+import tempfile
+from pathlib import Path
+from typing import Tuple
+from lxml import etree
 
 
 def structural_fingerprint(html: str) -> str:
@@ -25,15 +29,89 @@ def structural_fingerprint(html: str) -> str:
 
     It's intentionally coarse but extremely effective for drift detection.
     """
-    soup = BeautifulSoup(html, "lxml")
-    tokens = []
+    parser = etree.HTMLParser(encoding="utf-8")
+    root = etree.fromstring(html.encode("utf-8", "replace"), parser)
+    return structural_fingerprint_from_tree(root)
 
-    for el in soup.find_all(True):  # True => all tags
-        cls = " ".join(el.get("class", []))
-        tokens.append(f"{el.name}:{cls}")
 
-    combined = "|".join(tokens)
-    return hashlib.sha1(combined.encode()).hexdigest()
+def content_digest(html: str) -> str:
+    """
+    Cheap hash of the raw HTML (not its structure).
+
+    Byte-identical snapshots always share a structural fingerprint, so a
+    matching content digest lets callers skip fingerprinting altogether.
+    """
+    return hashlib.blake2b(html.encode("utf-8", "replace"), digest_size=16).hexdigest()
+
+
+def structural_fingerprint_from_tree(root) -> str:
+    """
+    Same fingerprint as structural_fingerprint(), computed from an already
+    parsed lxml tree so callers that also run selectors only parse once.
+    """
+    h = hashlib.blake2b(digest_size=20)
+
+    if root is None:  # empty / unparseable document
+        return h.hexdigest()
+
+    # Stream tag:class tokens straight into the hasher (no token list / join)
+    for el in root.iter():
+        if not isinstance(el.tag, str):  # skip comments / processing instructions
+            continue
+        h.update(el.tag.encode())
+        h.update(b":")
+        cls = el.get("class")
+        if cls:
+            h.update(" ".join(cls.split()).encode())
+        h.update(b"|")
+
+    return h.hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Write via a temp file + os.replace() so readers never see a partial file."""
+    # Unique temp name per writer, so concurrent saves can't clobber each other
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def load_snapshot_meta(path: Path) -> Tuple[str, str]:
+    """
+    Return (structural fingerprint, content digest) for a cached snapshot.
+
+    Both live in the snapshot's `.fp` sidecar ("<fp>\n<digest>"). If the
+    sidecar is missing it is rebuilt from the snapshot once, so later runs
+    never need to re-read or re-parse the snapshot itself.
+    """
+    fp_file = path.with_suffix(".fp")
+    if fp_file.exists():
+        fp, _, digest = fp_file.read_text(encoding="utf-8").partition("\n")
+        return fp.strip(), digest.strip()
+
+    html = path.read_text(encoding="utf-8")
+    fp, digest = structural_fingerprint(html), content_digest(html)
+    _atomic_write(fp_file, f"{fp}\n{digest}\n".encode("utf-8"))
+    return fp, digest
+
+
+def save_snapshot(path: Path, html: str, fp: str, digest: str):
+    """
+    Store a new snapshot and its `.fp` sidecar.
+
+    The old sidecar is removed first and both files are replaced atomically,
+    so an interrupted save can never leave a sidecar describing other content
+    (at worst the sidecar is missing and gets rebuilt on the next run).
+    """
+    fp_file = path.with_suffix(".fp")
+    fp_file.unlink(missing_ok=True)
+    _atomic_write(path, html.encode("utf-8"))
+    _atomic_write(fp_file, f"{fp}\n{digest}\n".encode("utf-8"))
 
 
 def diff_summary(prev_html: str, curr_html: str) -> dict:
@@ -46,9 +124,36 @@ def diff_summary(prev_html: str, curr_html: str) -> dict:
             "curr_fp": <hash>
         }
     """
-    prev_fp = structural_fingerprint(prev_html) if prev_html else ""
     curr_fp = structural_fingerprint(curr_html)
+    if prev_html == curr_html:  # identical content → identical structure
+        return _summary(curr_fp, curr_fp)
+
+    prev_fp = structural_fingerprint(prev_html) if prev_html else ""
+
+    return _summary(prev_fp, curr_fp)
+
+
+def diff_summary_from_tree(
+    prev_fp: str,
+    root,
+    prev_digest: str = "",
+    curr_digest: str = ""
+) -> dict:
+    """
+    Same as diff_summary(), but takes an already computed previous
+    fingerprint and an already parsed lxml tree of the current snapshot, so
+    nothing has to be read or re-parsed.
+
+    If both content_digest() values are given and match, the page is
+    byte-identical to the previous snapshot and the tree walk is skipped.
+    """
+    if prev_fp and curr_digest and prev_digest == curr_digest:
+        return _summary(prev_fp, prev_fp)
+
+    return _summary(prev_fp, structural_fingerprint_from_tree(root))
+
 
+def _summary(prev_fp: str, curr_fp: str) -> dict:
     changed = bool(prev_fp and prev_fp != curr_fp)
 
     return {
@@ -9,8 +9,9 @@ import random
 import time
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
-from typing import Optional, Callable, Awaitable
-from aiohttp import ClientSession, ClientTimeout
+from typing import Any, AsyncIterator, Dict, Optional, Callable, Awaitable
+from urllib.parse import urlsplit
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 
 
 # ─────────────────────────────────────────────────────────────
@@ -48,27 +49,25 @@ class RateLimiter:
     """
     Simple token bucket rate limiter.
     Prevents upstream bans and handles uneven traffic.
+
+    Bookkeeping is in integer nanoseconds (GCRA form of the token bucket):
+    `next_ns` is when the next token is due, and up to `capacity` tokens may
+    be taken early as a burst.
     """
-    def __init__(self, rate_per_sec: float, capacity: int):
-        self.rate = rate_per_sec
-        self.capacity = capacity
-        self.tokens = float(capacity)
-        self.t = time.monotonic()
-
-    async def acquire(self):
-        while True:
-            now = time.monotonic()
-            self.tokens = min(
-                self.capacity,
-                self.tokens + (now - self.t) * self.rate
-            )
-            self.t = now
+    def __init__(self, rate_per_sec: float, capacity: int) -> None:
+        self.ns_per_token: int = int(1_000_000_000 / rate_per_sec)
+        self.burst_ns: int = max(capacity - 1, 0) * self.ns_per_token
+        self.next_ns: int = time.monotonic_ns()
 
-            if self.tokens >= 1.0:
-                self.tokens -= 1.0
-                return
+    async def acquire(self) -> None:
+        now = time.monotonic_ns()
+        scheduled = max(now, self.next_ns)
+        self.next_ns = scheduled + self.ns_per_token
 
-            await asyncio.sleep(0.05)
+        # Slot is reserved before sleeping, so concurrent callers are paced in order
+        wait = scheduled - self.burst_ns - now
+        if wait > 0:
+            await asyncio.sleep(wait / 1e9)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -81,34 +80,53 @@ class CircuitBreaker:
     Opens after fail_threshold, closes after cooldown.
     """
 
-    def __init__(self, fail_threshold=8, cooldown=15.0):
-        self.fail_threshold = fail_threshold
-        self.cooldown = cooldown
-        self.failures = 0
-        self.open_until = 0.0
+    def __init__(self, fail_threshold: int = 8, cooldown: float = 15.0) -> None:
+        self.fail_threshold: int = fail_threshold
+        self.cooldown: float = cooldown
+        self.failures: int = 0
+        self.open_until: float = 0.0
 
-    def on_success(self):
+    def on_success(self) -> None:
         self.failures = 0
         self.open_until = 0.0
 
-    def on_failure(self):
+    def on_failure(self) -> None:
         self.failures += 1
         if self.failures >= self.fail_threshold:
             self.open_until = time.monotonic() + self.cooldown
 
-    def check(self):
+    def check(self) -> None:
         if time.monotonic() < self.open_until:
             raise CircuitOpen("Circuit open: temporarily backing off.")
 
 
+# One breaker per upstream host, so a failing host can't block the others
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+
+# Backoff is read-only config, so a single shared default is safe
+_DEFAULT_BACKOFF = Backoff()
+
+
+def _breaker_for(url: str) -> CircuitBreaker:
+    """Return the shared CircuitBreaker for the URL's host (created on first use)."""
+    host = urlsplit(url).netloc.lower()
+    breaker = _BREAKERS.get(host)
+    if breaker is None:
+        breaker = _BREAKERS[host] = CircuitBreaker()
+    return breaker
+
+
 # ─────────────────────────────────────────────────────────────
 # HTTP Session Context Manager
 # ─────────────────────────────────────────────────────────────
 
 @asynccontextmanager
-async def session(headers: Optional[dict] = None) -> ClientSession:
+async def session(headers: Optional[Dict[str, str]] = None) -> AsyncIterator[ClientSession]:
     """
     aiohttp session with sane defaults for production scraping.
+
+    Open it once per pipeline run and pass it to fetch_text() so
+    connections are reused instead of re-negotiated per URL.
     """
     ua = headers or {
         "User-Agent": "GuardrailsBot/1.0 (+https://example.com)"
@@ -118,7 +136,13 @@ async def session(headers: Optional[dict] = None) -> ClientSession:
         connect=10,
         sock_read=20
     )
-    async with ClientSession(headers=ua, timeout=timeout) as s:
+    # One pooled connector per session: keep-alive + cached DNS across requests
+    connector = TCPConnector(
+        limit=32,
+        ttl_dns_cache=300,
+        keepalive_timeout=60
+    )
+    async with ClientSession(headers=ua, timeout=timeout, connector=connector) as s:
         yield s
 
 
@@ -126,16 +150,25 @@ async def session(headers: Optional[dict] = None) -> ClientSession:
 # Exponential Backoff Executor
 # ─────────────────────────────────────────────────────────────
 
+# Dedicated jitter RNG (seeded once; not shared with callers of `random`)
+_RNG = random.Random()
+
+
 async def exp_backoff_call(
-    fn: Callable[[], Awaitable],
+    fn: Callable[[], Awaitable[Any]],
     backoff: Backoff,
     breaker: CircuitBreaker
-):
+) -> Any:
     """
     Executes fn() with retries, jitter, exponential backoff, and circuit breaker protection.
     """
-    delay = backoff.base
-    last_exc = None
+    # Exponential delay schedule, computed once per call
+    schedule = [
+        backoff.base * backoff.multiplier ** i
+        for i in range(backoff.attempts)
+    ]
+    step = 0
+    last_exc: Optional[BaseException] = None
 
     for _ in range(backoff.attempts):
         try:
@@ -151,21 +184,22 @@ async def exp_backoff_call(
         except Exception as e:
             last_exc = e
             breaker.on_failure()
+            delay = schedule[step]
+            step += 1
 
             # Increase penalty for known retryable errors
-            penalty = 0.0
-            status = getattr(e, "status", None)
+            penalty: float = 0.0
+            status: Optional[int] = getattr(e, "status", None)
             if status in (429, 500, 502, 503, 504):
                 penalty = 0.5 * delay
 
             sleep_for = (
                 min(delay, backoff.cap)
-                + random.random() * backoff.jitter
+                + _RNG.random() * backoff.jitter
                 + penalty
             )
 
             await asyncio.sleep(sleep_for)
-            delay *= backoff.multiplier
 
     raise RetryExhausted(str(last_exc) if last_exc else "Retry attempts exhausted.")
 
@@ -177,9 +211,10 @@ async def exp_backoff_call(
 async def fetch_text(
     url: str,
     rl: RateLimiter,
-    headers: Optional[dict] = None,
-    backoff: Backoff = Backoff(),
-    breaker: CircuitBreaker = CircuitBreaker()
+    *,
+    client: ClientSession,
+    backoff: Optional[Backoff] = None,
+    breaker: Optional[CircuitBreaker] = None
 ) -> str:
     """
     Fetch a URL with:
@@ -188,21 +223,32 @@ async def fetch_text(
     - Jitter
     - Circuit breaker
 
+    `client` is a shared session from session(); headers are configured
+    there. It and the remaining options are keyword-only.
+    Without an explicit `breaker`, the per-host breaker for `url` is used.
+
     Returns:
         HTML/text response.
     """
 
-    await rl.acquire()
-
-    async with session(headers=headers) as s:
+    backoff = backoff or _DEFAULT_BACKOFF
+    breaker = breaker or _breaker_for(url)
 
-        async def _get():
-            async with s.get(url, allow_redirects=True) as r:
-                if r.status >= 400:
-                    ex = Exception(f"http {r.status} {url}")
-                    setattr(ex, "status", r.status)  # annotate for retry logic
-                    raise ex
-
-                return await r.text()
+    await rl.acquire()
 
-        return await exp_backoff_call(_get, backoff, breaker)
+    async def _get() -> str:
+        async with client.get(url, allow_redirects=True) as r:
+            if r.status >= 400:
+                ex = Exception(f"http {r.status} {url}")
+                setattr(ex, "status", r.status)  # annotate for retry logic
+                raise ex
+
+            # Decode ourselves: r.text() falls back to charset sniffing when
+            # the header has no charset, which is slow on large pages.
+            raw = await r.read()
+            try:
+                return raw.decode(r.charset or "utf-8", "replace")
+            except LookupError:  # unknown charset label in the header
+                return raw.decode("utf-8", "replace")
+
+    return await exp_backoff_call(_get, backoff, breaker)
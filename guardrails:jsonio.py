@@ -0,0 +1,37 @@
+"""
+JSON (de)serialization helpers for scraper guardrails.
+
+Uses orjson when it's installed and falls back to the stdlib json module
+otherwise. The fallback is configured to emit the same compact UTF-8 output
+as orjson, so JSONL files and log lines don't depend on which optional
+packages are present.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize `obj` to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a compact JSON string."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
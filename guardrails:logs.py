@@ -3,10 +3,14 @@ Structured JSON logging for scraper guardrails.
 Designed for observability, debugging, and incident triage.
 """
 
-import json
 import logging
 import sys
-from datetime import datetime, timezone
+
+from guardrails.jsonio import dumps
+
+
+# Metadata fields copied from the record when present
+_FIELDS = ("run_id", "pipeline", "step", "url", "error_code")
 
 
 class JsonFormatter(logging.Formatter):
@@ -14,21 +18,20 @@ class JsonFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": int(record.created),
             "level": record.levelname,
             "message": record.getMessage(),
         }
 
         # Enrich logs with metadata if provided
-        for field in ("run_id", "pipeline", "step", "url", "error_code"):
-            if hasattr(record, field):
-                payload[field] = getattr(record, field)
+        extra = record.__dict__
+        payload.update({f: extra[f] for f in _FIELDS if f in extra})
 
         # Capture exceptions cleanly
         if record.exc_info:
             payload["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(payload, ensure_ascii=False)
+        return dumps(payload)
 
 
 def setup(level=logging.INFO, **defaults) -> logging.LoggerAdapter:
@@ -5,8 +5,62 @@ Provide multiple fallback strategies so pipelines keep working even when
 a page template changes (anti-fragile parsing).
 """
 
-from typing import List, Optional, Tuple
-from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Tuple, cast
+from cssselect import HTMLTranslator
+from lxml import etree, html as lxml_html
+
+
+# CSS → XPath translation is done once per selector and reused across pages
+_TRANSLATOR = HTMLTranslator()
+_XPATH_CACHE: Dict[str, etree.XPath] = {}
+# Visible text only, like bs4's get_text(): skip <script>/<style>/<template>
+_TEXT = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template)]"
+)
+_PARSER = lxml_html.HTMLParser(encoding="utf-8")
+
+
+def _xpath_for(css: str) -> etree.XPath:
+    """Return the compiled XPath for a CSS selector (cached per expression)."""
+    xp = _XPATH_CACHE.get(css)
+    if xp is None:
+        xp = etree.XPath(_TRANSLATOR.css_to_xpath(css))
+        _XPATH_CACHE[css] = xp
+    return xp
+
+
+def _select_one(
+    root: Optional[lxml_html.HtmlElement],
+    css: str
+) -> Optional[lxml_html.HtmlElement]:
+    """First element matching `css` in document order, or None."""
+    if root is None:
+        return None
+    # Selector XPaths are element-only expressions
+    matches = cast(List[lxml_html.HtmlElement], _xpath_for(css)(root))
+    return matches[0] if matches else None
+
+
+def parse_html(html: str) -> Optional[lxml_html.HtmlElement]:
+    """
+    Parse an HTML document into an lxml tree for try_select().
+
+    Returns None for an empty (or whitespace/comment-only) document instead
+    of raising, so such pages still yield a "none" selector result.
+    """
+    return etree.fromstring(html.encode("utf-8", "replace"), _PARSER)
+
+
+def compile_selectors(candidates: List[Tuple[str, str]]) -> None:
+    """
+    Pre-compile a candidate list (same format as try_select) so the first
+    page doesn't pay the CSS → XPath translation cost.
+    """
+    for strategy, expr in candidates:
+        if strategy == "css":
+            _xpath_for(expr)
+        elif strategy == "attr":
+            _xpath_for(expr.partition("::")[0])
 
 
 class SelectorResult:
@@ -16,17 +70,17 @@ class SelectorResult:
       - strategy: which method succeeded ("css", "attr", "none")
       - idx: index of the fallback candidate
     """
-    def __init__(self, value: Optional[str], strategy: str, idx: int):
+    def __init__(self, value: Optional[str], strategy: str, idx: int) -> None:
         self.value = value
         self.strategy = strategy
         self.idx = idx
 
-    def __repr__(self):
+    def __repr__(self) -> str:
         return f"SelectorResult(value={self.value!r}, strategy={self.strategy!r}, idx={self.idx})"
 
 
 def try_select(
-    soup: BeautifulSoup,
+    root: Optional[lxml_html.HtmlElement],
     candidates: List[Tuple[str, str]]
 ) -> SelectorResult:
     """
@@ -34,9 +88,11 @@ def try_select(
 
     candidates: List of (strategy, expr)
         strategy ∈ {"css", "attr"}
-        - "css": standard CSS selector (soup.select_one(expr))
+        - "css": standard CSS selector (first match in document order)
         - "attr": "selector::attribute" form; extracts HTML attributes
 
+    root: parsed document, e.g. from parse_html(html); None for an empty page
+
     Returns:
         SelectorResult(value, strategy_name, candidate_index)
 
@@ -47,17 +103,18 @@ def try_select(
 
         # CSS selector extraction
         if strategy == "css":
-            el = soup.select_one(expr)
-            if el:
-                text = el.get_text(strip=True)
+            el = _select_one(root, expr)
+            if el is not None:
+                texts = cast(List[str], _TEXT(el))
+                text = "".join(t.strip() for t in texts)
                 if text:
                     return SelectorResult(text, "css", i)
 
         # Attribute extraction: e.g.  "meta[property='og:title']::content"
         elif strategy == "attr":
             selector, _, attr = expr.partition("::")
-            el = soup.select_one(selector)
-            if el and el.get(attr):
+            el = _select_one(root, selector)
+            if el is not None and el.get(attr):
                 return SelectorResult(el.get(attr), "attr", i)
 
     # No candidate worked → return empty result
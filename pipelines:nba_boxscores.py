@@ -11,51 +11,104 @@ This is a real example pipeline that demonstrates:
 """
 
 import asyncio
-import json
+import hashlib
 from pathlib import Path
-from typing import List
-
-from bs4 import BeautifulSoup
-
-from guardrails.fetch import fetch_text, RateLimiter
-from guardrails.selectors import try_select
-from guardrails.diffwatch import diff_summary
+from typing import List, Optional, Tuple
+
+from aiohttp import ClientSession
+
+from guardrails.fetch import fetch_text, session, RateLimiter
+from guardrails.selectors import compile_selectors, parse_html, try_select
+from guardrails.diffwatch import (
+    content_digest,
+    diff_summary_from_tree,
+    load_snapshot_meta,
+    save_snapshot,
+)
 from guardrails.health import write_status
+from guardrails.jsonio import dumps_bytes
 from guardrails.logs import setup as setup_logs
 
 
 # Rate limiter: 1.5 requests/sec with a burst capacity of 3
 RL = RateLimiter(rate_per_sec=1.5, capacity=3)
 
+# Max scrape_one() calls (fetch + parse + diff) in flight at once; gather()
+# still schedules one task per URL, the semaphore only bounds active work
+MAX_IN_FLIGHT = 16
 
-async def scrape_one(url: str, cache_dir: Path, log) -> dict:
-    """Scrape a single NBA page using guardrails."""
+# Anti-fragile selector set for page title / headline
+TITLE_SELECTORS = [
+    ("css", "h1.headline"),
+    ("css", "header h1"),
+    ("attr", "meta[property='og:title']::content"),
+    ("css", "title"),
+]
+compile_selectors(TITLE_SELECTORS)
 
-    log.info("fetching", extra={"url": url, "step": "fetch"})
 
-    html = await fetch_text(url, RL)
-    soup = BeautifulSoup(html, "lxml")
+def _url_key(url: str) -> str:
+    """Stable, collision-resistant snapshot name for a URL."""
+    return hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
 
-    # Anti-fragile selector set for page title / headline
-    title = try_select(soup, [
-        ("css", "h1.headline"),
-        ("css", "header h1"),
-        ("attr", "meta[property='og:title']::content"),
-        ("css", "title"),
-    ])
 
-    # Cache system for diffwatch
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    snap_file = cache_dir / ("snap_" + url.replace("/", "_")[:150] + ".html")
+def _load_and_diff(snap_file: Path, html: str, root) -> Tuple[dict, str, bool]:
+    """
+    Blocking diffwatch cache read for one URL: load the previous fingerprint
+    and diff it against the new (already parsed) page.
+
+    Returns (diff, content digest of `html`, unchanged-since-last-snapshot).
+    Runs via asyncio.to_thread() so disk stalls don't block other fetches.
+    """
+    snap_file.parent.mkdir(parents=True, exist_ok=True)
 
-    prev_html = ""
+    # Previous fingerprint + digest come from the .fp sidecar
+    prev_fp, prev_digest = "", ""
     if snap_file.exists():
-        prev_html = snap_file.read_text(encoding="utf-8")
+        prev_fp, prev_digest = load_snapshot_meta(snap_file)
+
+    # Byte-identical page → reuse the previous fingerprint (no tree walk)
+    digest = content_digest(html)
+    diff = diff_summary_from_tree(prev_fp, root, prev_digest, digest)
+
+    return diff, digest, bool(prev_fp) and digest == prev_digest
+
+
+async def scrape_one(
+    url: str,
+    s: ClientSession,
+    cache_dir: Path,
+    log,
+    pending_writes: Optional[List[asyncio.Task]] = None
+) -> dict:
+    """
+    Scrape a single NBA page using guardrails.
+
+    If `pending_writes` is given, the snapshot write is started as a
+    background task (named after the URL) and appended there instead of
+    being awaited; the caller must await those tasks before exiting.
+    """
+
+    log.info("fetching", extra={"url": url, "step": "fetch"})
 
-    diff = diff_summary(prev_html, html)
+    html = await fetch_text(url, RL, client=s)
+    # Parse once: the same tree feeds selectors and the structural diff
+    root = parse_html(html)
 
-    # Save new snapshot
-    snap_file.write_text(html, encoding="utf-8")
+    title = try_select(root, TITLE_SELECTORS)
+
+    # Cache system for diffwatch (disk I/O runs in worker threads)
+    snap_file = cache_dir / f"snap_{_url_key(url)}.html"
+    diff, digest, unchanged = await asyncio.to_thread(_load_and_diff, snap_file, html, root)
+
+    # Save new snapshot (skipped if byte-identical): only the *next* run needs
+    # it, so keep it off the hot path
+    if not unchanged:
+        write = asyncio.to_thread(save_snapshot, snap_file, html, diff["curr_fp"], digest)
+        if pending_writes is None:
+            await write
+        else:
+            pending_writes.append(asyncio.create_task(write, name=url))
 
     return {
         "url": url,
@@ -85,30 +138,57 @@ async def run(
     log = setup_logs(pipeline=pipeline_name, step="run")
 
     ok, bad = 0, 0
+
+    # One scrape per distinct URL: duplicates would race on the same snapshot
+    urls = list(dict.fromkeys(urls))
     cache_dir = Path(".cache")
 
     # Ensure output dirs exist
     out_ok.parent.mkdir(parents=True, exist_ok=True)
     out_dlq.parent.mkdir(parents=True, exist_ok=True)
 
-    async def handle(url: str):
+    # Open outputs once for the whole run instead of once per record
+    ok_f = out_ok.open("ab", buffering=1 << 16)
+    dlq_f = out_dlq.open("ab", buffering=1 << 16)
+
+    sem = asyncio.Semaphore(MAX_IN_FLIGHT)
+    pending_writes: List[asyncio.Task] = []
+
+    async def handle(url: str, s: ClientSession):
         nonlocal ok, bad
 
         try:
-            item = await scrape_one(url, cache_dir, log)
-            out_ok.open("a", encoding="utf-8").write(json.dumps(item) + "\n")
+            async with sem:
+                item = await scrape_one(url, s, cache_dir, log, pending_writes)
+            ok_f.write(dumps_bytes(item) + b"\n")
             ok += 1
 
         except Exception as e:
             log.warning("scrape failed", extra={"url": url, "error_code": "SCRAPE_FAIL"})
-            out_dlq.open("a", encoding="utf-8").write(json.dumps({
+            dlq_f.write(dumps_bytes({
                 "url": url,
                 "error": str(e)
-            }) + "\n")
+            }) + b"\n")
             bad += 1
 
     # Run with bounded concurrency via gather()
-    await asyncio.gather(*(handle(u) for u in urls))
+    try:
+        # One shared session for the whole run → pooled keep-alive connections
+        async with session() as s:
+            await asyncio.gather(*(handle(u, s) for u in urls))
+
+        # Flush background snapshot writes before reporting the run as done
+        results = await asyncio.gather(*pending_writes, return_exceptions=True)
+        for task, r in zip(pending_writes, results):
+            if isinstance(r, BaseException):
+                log.warning(
+                    f"snapshot write failed for {task.get_name()}: {r!r}",
+                    exc_info=r,
+                    extra={"url": task.get_name(), "error_code": "SNAPSHOT_WRITE_FAIL"}
+                )
+    finally:
+        ok_f.close()
+        dlq_f.close()
 
     # Write health report
     write_status(health_path, ok=ok, total=len(urls))